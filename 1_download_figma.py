@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 #!/usr/bin/env python3
 """
 Step 1: Download Figma File
@@ -8,9 +7,72 @@ Downloads a Figma file and saves it as JSON
 import os
 import sys
 import json
+import mmap
+import queue
+import threading
+import time
 import requests
+import urllib3
 import re
 from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional: fastest --pretty, re-indents without parsing
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: binary cache for step 2 (--msgpack)
+    msgpack = None
+
+try:
+    import ijson
+except ImportError:  # Optional: lets --pretty parse while downloading
+    ijson = None
+
+# Figma personal access tokens look like figd_<...>; checked locally so a
+# mistyped token fails fast instead of after a slow 401 round trip
+_TOKEN_RE = re.compile(r"^(figd_|figu_)[A-Za-z0-9_-]{20,}$")
+
+_API_BASE = "https://api.figma.com/v1/files/"
+
+# Figma JSON compresses very well, so ask for every encoding urllib3 can
+# decode (gzip, deflate, plus br when brotli is installed)
+_ACCEPT_ENCODING = urllib3.util.make_headers(accept_encoding=True)["accept-encoding"]
+
+# Error message and hint for the API errors we know how to explain
+_STATUS_MESSAGES = {
+    401: ("Invalid Figma token", "Get your token from: https://www.figma.com/settings"),
+    403: ("Access denied", "Make sure you have access to this file"),
+    404: ("File not found", "Check your Figma URL"),
+}
+
+# One shared session so repeated downloads reuse the TCP/TLS connection.
+# Transient gateway errors are retried with backoff; anything else is
+# reported by download_figma_file.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
 
 
 def print_header():
@@ -20,43 +82,208 @@ def print_header():
     print()
 
 
-def get_file_key_from_url(url: str) -> str:
-    """Extract file key from Figma URL"""
-    patterns = [
-        r"figma\.com/design/([a-zA-Z0-9]+)",
-        r"figma\.com/file/([a-zA-Z0-9]+)",
-    ]
+def parse_figma_url(url: str) -> Tuple[str, Optional[str]]:
+    """Extract file key and optional node ID from Figma URL"""
+    # Figma URLs have a fixed shape (figma.com/<design|file>/<key>/...),
+    # so plain string splitting is enough - no regex needed
+    _, found, rest = url.partition("figma.com/")
+    kind, _, tail = rest.partition("/")
+    file_key = tail.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
 
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    if not found or kind not in ("design", "file"):
+        raise ValueError("❌ Invalid Figma URL format")
+    if not (file_key.isascii() and file_key.isalnum()):
+        raise ValueError("❌ Invalid Figma URL format")
 
-    raise ValueError("❌ Invalid Figma URL format")
+    node_id = url.partition("node-id=")[2].split("&", 1)[0]
+    return file_key, node_id.replace("-", ":") or None
 
 
-def get_node_id_from_url(url: str) -> str:
-    """Extract node ID from Figma URL (optional)"""
-    match = re.search(r"node-id=([^&]+)", url)
-    if match:
-        return match.group(1).replace("-", ":")
-    return None
+def write_bytes(output_file: str, payload: bytes) -> int:
+    """Write an encoded payload straight to a raw file descriptor"""
+    # Skips the buffered/text io layers; the kernel gets the whole payload
+    # in one write call (looped only for partial writes). Written to a
+    # temporary file first, so an interrupted run keeps the old file intact.
+    tmp_file = f"{output_file}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    try:
+        fd = os.open(tmp_file, flags, 0o644)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return len(payload)
+
+
+def write_pretty_json(data: Any, json_file: str) -> int:
+    """Write parsed JSON data with 2-space indentation, returning its size"""
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return write_bytes(json_file, payload)
+
+
+def load_json_file(json_file: str) -> Any:
+    """Parse a JSON file"""
+    with open(json_file, "rb") as f:
+        # An empty file cannot be mapped; json.load reports it as invalid JSON
+        if orjson and os.fstat(f.fileno()).st_size:
+            # Parse straight from the page cache instead of reading a copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        return json.load(f)
+
+
+def pretty_print_json(json_file: str) -> int:
+    """Re-write a JSON file with 2-space indentation for human reading"""
+    # An empty file cannot be mapped; load_json_file reports it as invalid
+    if msgspec and os.path.getsize(json_file):
+        # Re-indent the JSON text directly, without building any Python
+        # objects for the document. Re-indenting keeps "\u00e9"-style
+        # escapes as they are, while every parsing path below decodes them,
+        # so files with escapes are parsed instead.
+        payload = None
+        with open(json_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"\\u") == -1:
+                    with memoryview(mm) as view:
+                        payload = msgspec.json.format(view, indent=2)
+        if payload is not None:
+            return write_bytes(json_file, payload)
+    return write_pretty_json(load_json_file(json_file), json_file)
+
+
+def write_msgpack_cache(json_file: str) -> str:
+    """Save a MessagePack copy of a JSON file for faster loading in step 2"""
+    cache_file = f"{json_file}.msgpack"
+    write_bytes(cache_file, msgpack.packb(load_json_file(json_file), use_bin_type=True))
+    return cache_file
+
+
+def preallocate_file(f, size: int):
+    """Allocate disk space for a file before writing it (Linux/Unix only)"""
+    if not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except OSError:
+        pass  # Filesystem does not support it; the write still works
+
+
+def read_response_chunks(response, chunks: queue.Queue, errors: List[Exception]):
+    """Read the response body into a queue (runs in a background thread)"""
+    try:
+        for chunk in response.iter_content(chunk_size=1024 * 1024):  # 1MB chunks
+            if chunk:
+                chunks.put(chunk)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        chunks.put(None)  # Tell the writer we are done
+
+
+def print_progress(downloaded_bytes: int, percent_per_byte: float):
+    """Redraw the download progress line"""
+    progress = downloaded_bytes * percent_per_byte
+    print(f"   Progress: {progress:.1f}% ({downloaded_bytes / (1024*1024):.1f} MB)", end='\r')
+
+
+def save_response_to_file(response, output_file: str, total_bytes: int = 0) -> int:
+    """Stream the raw response body to disk, returning the bytes written"""
+    # Step 2 parses the file anyway, so there is no need to decode and
+    # re-encode it here. Write to a temporary file first so an interrupted
+    # download never leaves a truncated JSON file behind.
+    tmp_file = f"{output_file}.tmp"
+
+    # Receive on a background thread while this one writes to disk. Both
+    # release the GIL, so the network and the disk are busy at the same time.
+    chunks = queue.Queue(maxsize=4)
+    errors = []
+    reader = threading.Thread(
+        target=read_response_chunks, args=(response, chunks, errors), daemon=True
+    )
+    reader.start()
+    reader_done = False
+    file_size = 0
+
+    # Redraw the progress line at most 4 times a second, and only on a
+    # terminal; redirected output would just fill up with progress lines
+    show_progress = total_bytes > 0 and sys.stdout.isatty()
+    percent_per_byte = 100.0 / total_bytes if total_bytes else 0.0
+    last_update = 0.0
+
+    try:
+        with open(tmp_file, "wb") as f:
+            # Reserve the space up front so the file lands in one extent.
+            # Only possible when the body is not compressed, since then
+            # Content-Length is the final file size.
+            encoding = response.headers.get("Content-Encoding", "identity")
+            if total_bytes and encoding == "identity":
+                preallocate_file(f, total_bytes)
+
+            # Content-Length counts compressed bytes, so progress is tracked
+            # on the wire (raw.tell()) rather than by decoded chunk sizes
+            for chunk in iter(chunks.get, None):
+                file_size += f.write(chunk)
+                if show_progress:
+                    now = time.monotonic()
+                    if now - last_update >= 0.25:
+                        last_update = now
+                        print_progress(response.raw.tell(), percent_per_byte)
+            reader_done = True  # The reader's end-of-body sentinel was consumed
+            if show_progress:
+                print_progress(response.raw.tell(), percent_per_byte)
+            f.truncate()  # Drop any preallocated space that was not used
+        reader.join()
+        if errors:
+            raise errors[0]
+        os.replace(tmp_file, output_file)
+    finally:
+        if not reader_done:
+            # Writing failed: stop the download and drain the queue until the
+            # reader thread has finished, so a blocked put() can return
+            response.close()
+            while reader.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    if show_progress:
+        print()  # New line after progress
+
+    return file_size
 
 
 def download_figma_file(
-    token: str, file_key: str, node_id: str = None, output_file: str = None
+    token: str,
+    file_key: str,
+    node_id: str = None,
+    output_file: str = None,
+    pretty: bool = False,
+    cache_msgpack: bool = False,
 ):
     """Download Figma file via API"""
 
     # Construct API URL
-    url = f"https://api.figma.com/v1/files/{file_key}"
+    url = _API_BASE + file_key
 
     params = {}
     if node_id:
         params["ids"] = node_id
         print(f"📌 Node ID: {node_id}")
 
-    headers = {"X-Figma-Token": token, "Content-Type": "application/json"}
+    headers = {"X-Figma-Token": token, "Accept-Encoding": _ACCEPT_ENCODING}
 
     print(f"🔗 File Key: {file_key}")
     print(f"📡 Downloading from Figma API...")
@@ -64,22 +291,13 @@ def download_figma_file(
 
     try:
         # Increased timeout to 300 seconds (5 minutes) for huge files
-        response = requests.get(url, headers=headers, params=params, timeout=300, stream=True)
+        response = _SESSION.get(url, headers=headers, params=params, timeout=300, stream=True)
 
         # Check for errors
-        if response.status_code == 401:
-            print("❌ Error: Invalid Figma token")
-            print("💡 Get your token from: https://www.figma.com/settings")
-            sys.exit(1)
-
-        if response.status_code == 403:
-            print("❌ Error: Access denied")
-            print("💡 Make sure you have access to this file")
-            sys.exit(1)
-
-        if response.status_code == 404:
-            print("❌ Error: File not found")
-            print("💡 Check your Figma URL")
+        if response.status_code in _STATUS_MESSAGES:
+            error, hint = _STATUS_MESSAGES[response.status_code]
+            print(f"❌ Error: {error}")
+            print(f"💡 {hint}")
             sys.exit(1)
 
         if response.status_code != 200:
@@ -89,44 +307,45 @@ def download_figma_file(
 
         # Get content length if available
         content_length = response.headers.get('Content-Length')
-        if content_length:
-            estimated_mb = int(content_length) / (1024 * 1024)
+        total_bytes = int(content_length) if content_length else 0
+        if total_bytes:
+            estimated_mb = total_bytes / (1024 * 1024)
             print(f"📦 Estimated size: {estimated_mb:.2f} MB")
             if estimated_mb > 10:
                 print("⏳ Large file detected, this may take a while...")
         
-        # Download with progress for large files
-        print("⬇️  Downloading...")
-        chunks = []
-        downloaded_bytes = 0
-        
-        for chunk in response.iter_content(chunk_size=1024 * 1024):  # 1MB chunks
-            if chunk:
-                chunks.append(chunk)
-                downloaded_bytes += len(chunk)
-                if content_length:
-                    progress = (downloaded_bytes / int(content_length)) * 100
-                    print(f"   Progress: {progress:.1f}% ({downloaded_bytes / (1024*1024):.1f} MB)", end='\r')
-        
-        if content_length:
-            print()  # New line after progress
-        
-        # Combine chunks and parse JSON
-        print("🔄 Parsing JSON...")
-        content = b''.join(chunks).decode('utf-8')
-        data = json.loads(content)
-
         # Determine output filename
         if not output_file:
             output_file = f"{file_key}.json"
 
-        # Save to file
-        print("💾 Saving to file...")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if pretty and ijson and not msgspec:
+            # Parse incrementally as the bytes arrive, so parsing overlaps
+            # with the network transfer instead of starting after it.
+            # (With msgspec the raw file is usually re-indented without parsing.)
+            print("⬇️  Downloading and parsing...")
+            response.raw.decode_content = True
+            data = next(
+                ijson.items(response.raw, "", buf_size=1024 * 1024, use_float=True)
+            )
+            print("🎨 Writing pretty-printed JSON...")
+            file_size = write_pretty_json(data, output_file)
+        else:
+            print("⬇️  Downloading...")
+            file_size = save_response_to_file(response, output_file, total_bytes)
+
+            if pretty:
+                print("🎨 Pretty-printing JSON...")
+                file_size = pretty_print_json(output_file)
+
+        if cache_msgpack:
+            if msgpack:
+                print("📦 Writing MessagePack cache for step 2...")
+                cache_file = write_msgpack_cache(output_file)
+                print(f"   Saved to: {cache_file}")
+            else:
+                print("⚠️  msgpack is not installed, skipping the .msgpack cache")
+                print("💡 Install it with: pip install msgpack")
 
-        # Calculate file size
-        file_size = os.path.getsize(output_file)
         size_mb = file_size / (1024 * 1024)
 
         print("✅ Download successful!")
@@ -159,6 +378,11 @@ def download_figma_file(
 def main():
     print_header()
 
+    # Pass --pretty to get an indented, human-readable JSON file
+    pretty = "--pretty" in sys.argv[1:]
+    # Pass --msgpack to also save a binary copy that step 2 loads faster
+    cache_msgpack = "--msgpack" in sys.argv[1:]
+
     # Get Figma token
     token = os.environ.get("FIGMA_TOKEN")
 
@@ -175,186 +399,11 @@ def main():
         print("✅ Using FIGMA_TOKEN from environment")
         print()
 
-    # Get Figma URL
-    print("🔗 Enter your Figma file URL:")
-    print("   Example: https://www.figma.com/design/ABC123...")
-    url = input("   URL: ").strip()
-    print()
-
-    if not url:
-        print("❌ Error: URL is required")
-        sys.exit(1)
-
-    # Parse URL
-    try:
-        file_key = get_file_key_from_url(url)
-        node_id = get_node_id_from_url(url)
-    except ValueError as e:
-        print(str(e))
+    if not _TOKEN_RE.match(token):
+        print("❌ Error: Token format invalid")
+        print("💡 Figma tokens start with figd_ - get one from: https://www.figma.com/settings")
         sys.exit(1)
 
-    # Optional: Custom output filename
-    print("💾 Output filename (press Enter for default):")
-    output_file = input(f"   [{file_key}.json]: ").strip()
-    if not output_file:
-        output_file = f"{file_key}.json"
-    print()
-
-    print("=" * 60)
-    print()
-
-    # Download
-    download_figma_file(token, file_key, node_id, output_file)
-
-
-if __name__ == "__main__":
-    main()
-=======
-#!/usr/bin/env python3
-"""
-Step 1: Download Figma File
-Downloads a Figma file and saves it as JSON
-"""
-
-import os
-import sys
-import json
-import requests
-import re
-from pathlib import Path
-
-
-def print_header():
-    print("=" * 60)
-    print("📥 STEP 1: Download Figma File")
-    print("=" * 60)
-    print()
-
-
-def get_file_key_from_url(url: str) -> str:
-    """Extract file key from Figma URL"""
-    patterns = [
-        r"figma\.com/design/([a-zA-Z0-9]+)",
-        r"figma\.com/file/([a-zA-Z0-9]+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-
-    raise ValueError("❌ Invalid Figma URL format")
-
-
-def get_node_id_from_url(url: str) -> str:
-    """Extract node ID from Figma URL (optional)"""
-    match = re.search(r"node-id=([^&]+)", url)
-    if match:
-        return match.group(1).replace("-", ":")
-    return None
-
-
-def download_figma_file(
-    token: str, file_key: str, node_id: str = None, output_file: str = None
-):
-    """Download Figma file via API"""
-
-    # Construct API URL
-    url = f"https://api.figma.com/v1/files/{file_key}"
-
-    params = {}
-    if node_id:
-        params["ids"] = node_id
-        print(f"📌 Node ID: {node_id}")
-
-    headers = {"X-Figma-Token": token, "Content-Type": "application/json"}
-
-    print(f"🔗 File Key: {file_key}")
-    print(f"📡 Downloading from Figma API...")
-    print()
-
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=60)
-
-        # Check for errors
-        if response.status_code == 401:
-            print("❌ Error: Invalid Figma token")
-            print("💡 Get your token from: https://www.figma.com/settings")
-            sys.exit(1)
-
-        if response.status_code == 403:
-            print("❌ Error: Access denied")
-            print("💡 Make sure you have access to this file")
-            sys.exit(1)
-
-        if response.status_code == 404:
-            print("❌ Error: File not found")
-            print("💡 Check your Figma URL")
-            sys.exit(1)
-
-        if response.status_code != 200:
-            print(f"❌ Error: HTTP {response.status_code}")
-            print(f"Response: {response.text[:200]}")
-            sys.exit(1)
-
-        # Parse JSON
-        data = response.json()
-
-        # Determine output filename
-        if not output_file:
-            output_file = f"{file_key}.json"
-
-        # Save to file
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-        # Calculate file size
-        file_size = os.path.getsize(output_file)
-        size_mb = file_size / (1024 * 1024)
-
-        print("✅ Download successful!")
-        print(f"📁 Saved to: {output_file}")
-        print(f"📊 File size: {size_mb:.2f} MB")
-        print()
-        print("=" * 60)
-        print("✨ Next step: Run the converter script")
-        print(f"   python 2_convert_to_yaml.py {output_file}")
-        print("=" * 60)
-
-    except requests.exceptions.Timeout:
-        print("❌ Error: Request timed out (60 seconds)")
-        print("💡 The file might be too large. Try again or check your connection.")
-        sys.exit(1)
-
-    except requests.exceptions.ConnectionError:
-        print("❌ Error: Connection failed")
-        print("💡 Check your internet connection")
-        sys.exit(1)
-
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        sys.exit(1)
-
-
-def main():
-    print_header()
-
-    # Get Figma token
-    token = os.environ.get("FIGMA_TOKEN")
-
-    if not token:
-        print("🔑 Enter your Figma Personal Access Token:")
-        print("   (Get it from: https://www.figma.com/settings)")
-        token = input("   Token: ").strip()
-        print()
-
-        if not token:
-            print("❌ Error: Token is required")
-            sys.exit(1)
-    else:
-        print("✅ Using FIGMA_TOKEN from environment")
-        print()
-
     # Get Figma URL
     print("🔗 Enter your Figma file URL:")
     print("   Example: https://www.figma.com/design/ABC123...")
@@ -367,8 +416,7 @@ def main():
 
     # Parse URL
     try:
-        file_key = get_file_key_from_url(url)
-        node_id = get_node_id_from_url(url)
+        file_key, node_id = parse_figma_url(url)
     except ValueError as e:
         print(str(e))
         sys.exit(1)
@@ -384,9 +432,10 @@ def main():
     print()
 
     # Download
-    download_figma_file(token, file_key, node_id, output_file)
+    download_figma_file(
+        token, file_key, node_id, output_file, pretty=pretty, cache_msgpack=cache_msgpack
+    )
 
 
 if __name__ == "__main__":
     main()
->>>>>>> 7f8c21ed401cad84e5bd773bf2ed8098230a339e
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 #!/usr/bin/env python3
 """
 Step 2: Convert Figma JSON to YAML
@@ -10,8 +9,176 @@ import sys
 import json
 import yaml
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import IO, Dict, Iterable, List, Optional, Tuple, Union, Any
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: lets step 2 read the .msgpack cache
+    msgpack = None
+
+try:
+    import ijson
+except ImportError:  # Optional: streams large files page by page
+    ijson = None
+
+try:
+    from yaml import CSafeDumper as YAMLDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YAMLDumper
+
+# yaml.dump options shared by every screen file
+_YAML_DUMP_OPTIONS = {
+    "Dumper": YAMLDumper,
+    "default_flow_style": False,
+    "sort_keys": False,
+    "allow_unicode": True,
+}
+
+# Below this many elements in total, starting worker processes and pickling
+# the screens to them costs more than dumping the YAML serially
+_PARALLEL_MIN_ELEMENTS = 50000
+
+# Errors raised for malformed input by whichever parser is in use
+_JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson else ())
+
+# Name sanitizing patterns, compiled once at import
+_RE_NON_WORD = re.compile(r"[^\w\s-]")
+_RE_SPACES = re.compile(r"[\s_]+")
+_RE_NODE_ID = re.compile(r"[^0-9A-Za-z]+")
+
+# Name words that mark a layer as an icon or an image. Names are split
+# into words, so "feedback" no longer matches "back" and a lookup is one
+# set intersection instead of a substring scan per keyword.
+_ICON_WORDS = frozenset(
+    {
+        "icon",
+        "icons",
+        "logo",
+        "logos",
+        "arrow",
+        "arrows",
+        "check",
+        "close",
+        "menu",
+        "search",
+        "heart",
+        "hearts",
+        "star",
+        "stars",
+        "home",
+        "profile",
+        "settings",
+        "notification",
+        "notifications",
+        "back",
+        "forward",
+        "play",
+        "pause",
+        "stop",
+        "edit",
+        "delete",
+        "add",
+        "plus",
+        "minus",
+        "refresh",
+        "share",
+        "download",
+        "upload",
+    }
+)
+_IMAGE_WORDS = frozenset(
+    {
+        "image",
+        "images",
+        "photo",
+        "photos",
+        "picture",
+        "pictures",
+        "img",
+        "illustration",
+        "illustrations",
+        "graphic",
+        "graphics",
+        "avatar",
+        "avatars",
+        "thumbnail",
+        "thumbnails",
+        "banner",
+        "banners",
+        "hero",
+        "background",
+    }
+)
+# Prefix-style markers (ic_home, li:search, bg_header) at the start of a word
+_ICON_PREFIX_RE = re.compile(r"(?<![a-z0-9])(?:li:|ic_|ico_|btn_)")
+_IMAGE_PREFIX_RE = re.compile(r"(?<![a-z0-9])bg_")
+# Words split on case and letter/digit boundaries too, so "ArrowLeft",
+# "icClose" and "icon24" still yield "arrow", "close" and "icon"
+_RE_NAME_WORDS = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+
+
+def _name_words(name: str) -> List[str]:
+    """Split a layer name into lowercase words"""
+    return [word.lower() for word in _RE_NAME_WORDS.findall(name)]
+
+# Two-digit hex for each channel byte, so colors skip format-spec parsing
+_HEX = [f"{i:02X}" for i in range(256)]
+
+# Node types whose children are normalized and mapped as a subtree
+_CONTAINER_TYPES = frozenset({"FRAME", "COMPONENT", "INSTANCE", "GROUP"})
+# Vector-like nodes, kept as icons or images
+_SHAPE_TYPES = frozenset(
+    {"VECTOR", "ELLIPSE", "LINE", "POLYGON", "STAR", "BOOLEAN_OPERATION"}
+)
+# Vector-like nodes that are always icons, whatever their name
+_ALWAYS_ICON_TYPES = frozenset({"VECTOR", "ELLIPSE"})
+# Top-level node types that become screens
+_SCREEN_TYPES = frozenset({"FRAME", "COMPONENT", "INSTANCE"})
+# Node types that count as an icon when they are small enough
+_SMALL_ICON_TYPES = frozenset({"VECTOR", "ELLIPSE", "FRAME"})
+
+
+@lru_cache(maxsize=4096)
+def sanitize_name(name: str) -> str:
+    """Sanitize a layer or screen name for file paths"""
+    # Cached: Figma files repeat generic names ("Vector", "Rectangle 1")
+    # thousands of times.
+    # Convert to lowercase, replace spaces and special chars with underscores
+    return _RE_SPACES.sub("_", _RE_NON_WORD.sub("", name.lower())).strip("_")
+
+
+@lru_cache(maxsize=4096)
+def _is_icon_name(name: str) -> bool:
+    """Check if a layer name marks it as an icon"""
+    return not _ICON_WORDS.isdisjoint(_name_words(name)) or bool(
+        _ICON_PREFIX_RE.search(name.lower())
+    )
+
+
+@lru_cache(maxsize=4096)
+def _is_image_name(name: str) -> bool:
+    """Check if a layer name marks it as an image"""
+    return not _IMAGE_WORDS.isdisjoint(_name_words(name)) or bool(
+        _IMAGE_PREFIX_RE.search(name.lower())
+    )
+
+
+def set_present(target: Dict[str, Any], *items) -> Dict[str, Any]:
+    """Copy (key, value) pairs into target, skipping values that are None"""
+    for key, value in items:
+        if value is not None:
+            target[key] = value
+    return target
 
 
 def print_header():
@@ -27,11 +194,21 @@ class FigmaNormalizer:
     def __init__(self, figma_file_key: str = None):
         """Initialize with optional Figma file key for asset URLs"""
         self.figma_file_key = figma_file_key
+        # id(raw node) -> whether its subtree contains text; filled while
+        # normalizing so each subtree is only searched once
+        self._has_text = {}
+
+    def reset(self):
+        """Drop per-file state before normalizing another file"""
+        # The text memo is keyed by object id, so it is only valid while the
+        # file it was built from is alive
+        self._has_text = {}
 
     def normalize(self, figma_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Normalize Figma data structure"""
 
         print("🔍 Analyzing JSON structure...")
+        self.reset()
 
         # Handle node-id specific requests
         if "nodes" in figma_data:
@@ -54,22 +231,57 @@ class FigmaNormalizer:
         print("   ⚠️  Unexpected JSON structure")
         return []
 
+    def normalize_pages(self, pages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize the pages of a full document as they are streamed in"""
+
+        print("🔍 Analyzing JSON structure...")
+        self.reset()
+        result = []
+        for page in pages:
+            # Each page is dropped once normalized, so its node ids can be
+            # reused by the next one; never carry the memo across pages.
+            self._has_text = {}
+            result.extend(self._normalize_list([page]))
+
+        if result:
+            print("   📄 Found full document (streamed)")
+        return result
+
     def _normalize_children(self, node: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Normalize all children of a node"""
         if "children" not in node:
             return []
 
+        return self._normalize_list(node["children"])
+
+    def _normalize_list(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize sibling nodes and their subtrees without recursion"""
         result = []
-        for child in node["children"]:
-            # Skip CANVAS nodes, but process their children
-            if child.get("type") == "CANVAS":
-                # Recursively get children from canvas
-                canvas_children = self._normalize_children(child)
-                result.extend(canvas_children)
+        # Each entry is an iterator over raw siblings and the list their
+        # normalized forms are appended to. Descending into a node pushes
+        # its children; the parent's iterator resumes once they are done.
+        stack = [(iter(nodes), result)]
+        while stack:
+            siblings, out = stack[-1]
+            for child in siblings:
+                # Skip CANVAS nodes, but process their children
+                if child.get("type") == "CANVAS":
+                    if "children" in child:
+                        stack.append((iter(child["children"]), out))
+                        break
+                    continue
+
+                normalized = self._normalize_fields(child)
+                if not normalized:
+                    continue
+                out.append(normalized)
+
+                # Containers come back with empty children; fill them next
+                if normalized["type"] in _CONTAINER_TYPES and "children" in child:
+                    stack.append((iter(child["children"]), normalized["children"]))
+                    break
             else:
-                normalized = self._normalize_node(child)
-                if normalized:
-                    result.append(normalized)
+                stack.pop()
 
         return result
 
@@ -103,7 +315,7 @@ class FigmaNormalizer:
             "layer",
         }
         if not safe_name or safe_name in generic_names:
-            id_suffix = re.sub(r"[^0-9A-Za-z]+", "_", str(node_id))
+            id_suffix = _RE_NODE_ID.sub("_", str(node_id))
             safe_name = f"{safe_name or 'asset'}_{id_suffix}"
 
         # Return Flutter asset path format
@@ -112,18 +324,19 @@ class FigmaNormalizer:
         else:  # image
             return f"assets/images/{safe_name}.png"
 
-    @staticmethod
-    def _sanitize_name(name: str) -> str:
-        """Sanitize asset name for file paths"""
-        # Convert to lowercase, replace spaces and special chars with underscores
-        name = name.lower()
-        name = re.sub(r"[^\w\s-]", "", name)
-        name = re.sub(r"[\s_]+", "_", name)
-        name = name.strip("_")
-        return name
+    _sanitize_name = staticmethod(sanitize_name)
 
     def _normalize_node(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Normalize a single node"""
+        """Normalize a single node and its subtree"""
+        # A CANVAS is only ever flattened into its parent's children
+        if node.get("type") == "CANVAS":
+            return None
+
+        result = self._normalize_list([node])
+        return result[0] if result else None
+
+    def _normalize_fields(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Normalize a single node, leaving container children empty"""
         node_type = node.get("type")
         node_id = node.get("id")
         name = node.get("name", "Unnamed")
@@ -141,252 +354,222 @@ class FigmaNormalizer:
         effects = node.get("effects")
         visible = node.get("visible", True)
 
-        # Detect icons and images by name patterns and visual characteristics
-        name_lower = name.lower()
-        is_icon = any(
-            keyword in name_lower
-            for keyword in [
-                "icon",
-                "logo",
-                "arrow",
-                "check",
-                "close",
-                "menu",
-                "search",
-                "heart",
-                "star",
-                "home",
-                "profile",
-                "settings",
-                "notification",
-                "back",
-                "forward",
-                "play",
-                "pause",
-                "stop",
-                "edit",
-                "delete",
-                "add",
-                "plus",
-                "minus",
-                "refresh",
-                "share",
-                "download",
-                "upload",
-                "li:",
-                "ic_",
-                "ico_",
-                "btn_",
-                "img_icon",
-                "icon_",
-            ]
-        )
-
-        is_image = any(
-            keyword in name_lower
-            for keyword in [
-                "image",
-                "photo",
-                "picture",
-                "img",
-                "illustration",
-                "graphic",
-                "avatar",
-                "thumbnail",
-                "banner",
-                "hero",
-                "bg_",
-                "background",
-            ]
+        # Small elements are likely icons. The size test is cheap, so it runs
+        # first and the name scan is skipped when it already decides.
+        is_icon = bool(
+            width
+            and height
+            and width <= 64
+            and height <= 64
+            and node_type in _SMALL_ICON_TYPES
         )
+        # Otherwise detect icons by name pattern
+        if not is_icon:
+            is_icon = _is_icon_name(name)
 
-        # Also detect icons/images by small size (likely icons) or by having image fills
+        # Also detect images by having image fills
         has_image_fill = False
         fills = node.get("fills", [])
         if fills and isinstance(fills, list):
-            for fill in fills:
-                if fill.get("type") == "IMAGE":
-                    has_image_fill = True
-                    break
-
-        # Small elements are likely icons
-        if not is_icon and width and height:
-            if (
-                width <= 64
-                and height <= 64
-                and (node_type in ["VECTOR", "ELLIPSE", "FRAME"])
-            ):
-                is_icon = True
+            # Nearly every node has a single fill; only scan when there are more
+            if len(fills) == 1:
+                has_image_fill = fills[0].get("type") == "IMAGE"
+            else:
+                has_image_fill = any(fill.get("type") == "IMAGE" for fill in fills)
 
         # Handle different node types
-        if node_type in ["FRAME", "COMPONENT", "INSTANCE", "GROUP"]:
+        if node_type in _CONTAINER_TYPES:
             # If it's an icon-like frame with no text children, mark as icon
             if (is_icon or has_image_fill) and not self._has_text_children(node):
                 if has_image_fill:
-                    return {
-                        "id": node_id,
-                        "name": name,
-                        "type": "IMAGE",
-                        "x": x,
-                        "y": y,
-                        "width": width,
-                        "height": height,
-                        "imageRef": name,
-                        "imageId": node_id,
-                        "url": self._generate_asset_url(node_id, name, "image"),
-                        "children": [],
-                    }
+                    normalized = {"id": node_id, "name": name, "type": "IMAGE"}
+                    set_present(
+                        normalized,
+                        ("x", x),
+                        ("y", y),
+                        ("width", width),
+                        ("height", height),
+                    )
+                    normalized["imageRef"] = name
+                    normalized["imageId"] = node_id
+                    normalized["url"] = self._generate_asset_url(node_id, name, "image")
+                    normalized["children"] = []
+                    return normalized
                 else:
-                    return {
-                        "id": node_id,
-                        "name": name,
-                        "type": "ICON",
-                        "x": x,
-                        "y": y,
-                        "width": width,
-                        "height": height,
-                        "iconName": name,
-                        "iconId": node_id,
-                        "url": self._generate_asset_url(node_id, name, "icon"),
-                        "children": [],
-                    }
+                    normalized = {"id": node_id, "name": name, "type": "ICON"}
+                    set_present(
+                        normalized,
+                        ("x", x),
+                        ("y", y),
+                        ("width", width),
+                        ("height", height),
+                    )
+                    normalized["iconName"] = name
+                    normalized["iconId"] = node_id
+                    normalized["url"] = self._generate_asset_url(node_id, name, "icon")
+                    normalized["children"] = []
+                    return normalized
 
             # If it's an image-like frame, mark as image
-            if is_image and not self._has_text_children(node):
-                return {
-                    "id": node_id,
-                    "name": name,
-                    "type": "IMAGE",
-                    "x": x,
-                    "y": y,
-                    "width": width,
-                    "height": height,
-                    "imageRef": name,
-                    "imageId": node_id,
-                    "url": self._generate_asset_url(node_id, name, "image"),
-                    "children": [],
-                }
-
-            return {
-                "id": node_id,
-                "name": name,
-                "type": node_type,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height,
-                "opacity": opacity,
-                "strokes": strokes,
-                "strokeWeight": stroke_weight,
-                "effects": effects,
-                "visible": visible,
-                "layoutMode": node.get("layoutMode"),
-                "paddingLeft": node.get("paddingLeft"),
-                "paddingRight": node.get("paddingRight"),
-                "paddingTop": node.get("paddingTop"),
-                "paddingBottom": node.get("paddingBottom"),
-                "itemSpacing": node.get("itemSpacing"),
-                "primaryAxisAlignItems": node.get("primaryAxisAlignItems"),
-                "counterAxisAlignItems": node.get("counterAxisAlignItems"),
-                "backgroundColor": self._extract_color(node.get("backgroundColor")),
-                "cornerRadius": node.get("cornerRadius"),
-                "children": self._normalize_children(node),
-            }
+            if _is_image_name(name) and not self._has_text_children(node):
+                normalized = {"id": node_id, "name": name, "type": "IMAGE"}
+                set_present(
+                    normalized,
+                    ("x", x),
+                    ("y", y),
+                    ("width", width),
+                    ("height", height),
+                )
+                normalized["imageRef"] = name
+                normalized["imageId"] = node_id
+                normalized["url"] = self._generate_asset_url(node_id, name, "image")
+                normalized["children"] = []
+                return normalized
+
+            normalized = {"id": node_id, "name": name, "type": node_type}
+            set_present(
+                normalized,
+                ("x", x),
+                ("y", y),
+                ("width", width),
+                ("height", height),
+                ("opacity", opacity),
+                ("strokes", strokes),
+                ("strokeWeight", stroke_weight),
+                ("effects", effects),
+                ("visible", visible),
+                ("layoutMode", node.get("layoutMode")),
+                ("paddingLeft", node.get("paddingLeft")),
+                ("paddingRight", node.get("paddingRight")),
+                ("paddingTop", node.get("paddingTop")),
+                ("paddingBottom", node.get("paddingBottom")),
+                ("itemSpacing", node.get("itemSpacing")),
+                ("primaryAxisAlignItems", node.get("primaryAxisAlignItems")),
+                ("counterAxisAlignItems", node.get("counterAxisAlignItems")),
+                ("backgroundColor", self._extract_color(node.get("backgroundColor"))),
+                ("cornerRadius", node.get("cornerRadius")),
+            )
+            normalized["children"] = []
+            return normalized
 
         elif node_type == "TEXT":
-            return {
-                "id": node_id,
-                "name": name,
-                "type": node_type,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height,
-                "characters": node.get("characters", ""),
-                "fontSize": self._extract_font_size(node.get("style")),
-                "fontWeight": node.get("style", {}).get("fontWeight"),
-                "fontFamily": node.get("style", {}).get("fontFamily"),
-                "textAlignHorizontal": node.get("style", {}).get("textAlignHorizontal"),
-                "color": self._extract_fill_color(node.get("fills")),
-                "lineHeight": self._extract_line_height(node.get("style")),
-                "letterSpacing": node.get("style", {}).get("letterSpacing"),
-                "style": node.get("style"),
-                "opacity": opacity,
-                "visible": visible,
-            }
+            # Look the style up once; a missing style reads as empty
+            style = node.get("style")
+            style_get = style.get if style else {}.get
+            normalized = {"id": node_id, "name": name, "type": node_type}
+            set_present(
+                normalized,
+                ("x", x),
+                ("y", y),
+                ("width", width),
+                ("height", height),
+                ("characters", node.get("characters", "")),
+                ("fontSize", style_get("fontSize")),
+                ("fontWeight", style_get("fontWeight")),
+                ("fontFamily", style_get("fontFamily")),
+                ("textAlignHorizontal", style_get("textAlignHorizontal")),
+                ("color", self._extract_fill_color(fills)),
+                ("lineHeight", style_get("lineHeightPx")),
+                ("letterSpacing", style_get("letterSpacing")),
+                ("style", style),
+                ("opacity", opacity),
+                ("visible", visible),
+            )
+            return normalized
 
         elif node_type == "RECTANGLE":
-            return {
-                "id": node_id,
-                "name": name,
-                "type": node_type,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height,
-                "fillColor": self._extract_fill_color(node.get("fills")),
-                "cornerRadius": node.get("cornerRadius"),
-                "opacity": opacity,
-                "strokes": strokes,
-                "strokeWeight": stroke_weight,
-                "effects": effects,
-                "visible": visible,
-            }
-
-        elif node_type in [
-            "VECTOR",
-            "ELLIPSE",
-            "LINE",
-            "POLYGON",
-            "STAR",
-            "BOOLEAN_OPERATION",
-        ]:
+            normalized = {"id": node_id, "name": name, "type": node_type}
+            set_present(
+                normalized,
+                ("x", x),
+                ("y", y),
+                ("width", width),
+                ("height", height),
+                ("fillColor", self._extract_fill_color(fills)),
+                ("cornerRadius", node.get("cornerRadius")),
+                ("opacity", opacity),
+                ("strokes", strokes),
+                ("strokeWeight", stroke_weight),
+                ("effects", effects),
+                ("visible", visible),
+            )
+            return normalized
+
+        elif node_type in _SHAPE_TYPES:
             # Check if it's an image fill
-            fills = node.get("fills", [])
-            if fills and isinstance(fills, list) and len(fills) > 0:
+            if fills and isinstance(fills, list):
                 first_fill = fills[0]
                 if first_fill.get("type") == "IMAGE":
-                    return {
-                        "id": node_id,
-                        "name": name,
-                        "type": "IMAGE",
-                        "x": x,
-                        "y": y,
-                        "width": width,
-                        "height": height,
-                        "imageRef": first_fill.get("imageRef") or name,
-                        "imageId": node_id,
-                        "url": self._generate_asset_url(node_id, name, "image"),
-                    }
+                    normalized = {"id": node_id, "name": name, "type": "IMAGE"}
+                    set_present(
+                        normalized,
+                        ("x", x),
+                        ("y", y),
+                        ("width", width),
+                        ("height", height),
+                    )
+                    normalized["imageRef"] = first_fill.get("imageRef") or name
+                    normalized["imageId"] = node_id
+                    normalized["url"] = self._generate_asset_url(node_id, name, "image")
+                    return normalized
 
             # Otherwise treat as icon
-            if is_icon or node_type in ["VECTOR", "ELLIPSE"]:
-                return {
-                    "id": node_id,
-                    "name": name,
-                    "type": "ICON",
-                    "x": x,
-                    "y": y,
-                    "width": width,
-                    "height": height,
-                    "iconName": name,
-                    "iconId": node_id,
-                    "url": self._generate_asset_url(node_id, name, "icon"),
-                    "children": [],
-                }
+            if is_icon or node_type in _ALWAYS_ICON_TYPES:
+                normalized = {"id": node_id, "name": name, "type": "ICON"}
+                set_present(
+                    normalized,
+                    ("x", x),
+                    ("y", y),
+                    ("width", width),
+                    ("height", height),
+                )
+                normalized["iconName"] = name
+                normalized["iconId"] = node_id
+                normalized["url"] = self._generate_asset_url(node_id, name, "icon")
+                normalized["children"] = []
+                return normalized
 
         return None
 
     def _has_text_children(self, node: Dict[str, Any]) -> bool:
         """Check if node has any text children"""
-        children = node.get("children", [])
-        for child in children:
-            if child.get("type") == "TEXT":
+        # Every FRAME/GROUP asks this about its subtree, so without the memo
+        # deep trees would be searched once per ancestor
+        memo = self._has_text
+        key = id(node)
+        if key in memo:
+            return memo[key]
+
+        # Depth-first walk with an explicit stack. A subtree is known to have
+        # no text once its iterator runs out; text found anywhere is also
+        # inside every subtree still on the stack.
+        stack = [(node, iter(node.get("children", [])))]
+        while stack:
+            current, children = stack[-1]
+            found = False
+            for child in children:
+                if child.get("type") == "TEXT":
+                    found = True
+                    break
+                if child.get("children"):
+                    cached = memo.get(id(child))
+                    if cached is None:
+                        stack.append((child, iter(child["children"])))
+                        break
+                    if cached:
+                        found = True
+                        break
+            else:
+                memo[id(current)] = False
+                stack.pop()
+                continue
+
+            if found:
+                for ancestor, _ in stack:
+                    memo[id(ancestor)] = True
                 return True
-            if child.get("children"):
-                if self._has_text_children(child):
-                    return True
-        return False
+
+        return memo[key]
 
     @staticmethod
     def _extract_color(color_data: Optional[Dict[str, Any]]) -> Optional[str]:
@@ -394,37 +577,23 @@ class FigmaNormalizer:
         if not color_data:
             return None
 
-        r = int(color_data.get("r", 0) * 255)
-        g = int(color_data.get("g", 0) * 255)
-        b = int(color_data.get("b", 0) * 255)
+        r = min(max(int(color_data.get("r", 0) * 255), 0), 255)
+        g = min(max(int(color_data.get("g", 0) * 255), 0), 255)
+        b = min(max(int(color_data.get("b", 0) * 255), 0), 255)
 
-        return f"#{r:02X}{g:02X}{b:02X}"
+        return f"#{_HEX[r]}{_HEX[g]}{_HEX[b]}"
 
     @staticmethod
     def _extract_fill_color(fills: Optional[List[Dict[str, Any]]]) -> Optional[str]:
         """Extract fill color from fills array"""
-        if not fills or not isinstance(fills, list) or len(fills) == 0:
+        if not fills or not isinstance(fills, list):
             return None
 
         first_fill = fills[0]
-        if first_fill.get("type") == "SOLID":
-            return FigmaNormalizer._extract_color(first_fill.get("color"))
-
-        return None
-
-    @staticmethod
-    def _extract_font_size(style: Optional[Dict[str, Any]]) -> Optional[float]:
-        """Extract font size from style"""
-        if not style:
+        if first_fill.get("type") != "SOLID":
             return None
-        return style.get("fontSize")
 
-    @staticmethod
-    def _extract_line_height(style: Optional[Dict[str, Any]]) -> Optional[float]:
-        """Extract line height from style"""
-        if not style:
-            return None
-        return style.get("lineHeightPx")
+        return FigmaNormalizer._extract_color(first_fill.get("color"))
 
 
 class SemanticMapper:
@@ -438,9 +607,7 @@ class SemanticMapper:
 
         for node in nodes:
             # If the node is a Frame/Component with children, treat it as a screen
-            if node.get("type") in ["FRAME", "COMPONENT", "INSTANCE"] and node.get(
-                "children"
-            ):
+            if node["type"] in _SCREEN_TYPES and node.get("children"):
                 screens.append(
                     {
                         "name": node["name"],
@@ -450,7 +617,7 @@ class SemanticMapper:
             # If it has children that are frames, treat each as a screen
             elif node.get("children"):
                 for child in node["children"]:
-                    if child.get("type") in ["FRAME", "COMPONENT", "INSTANCE"]:
+                    if child["type"] in _SCREEN_TYPES:
                         screens.append(
                             {
                                 "name": child["name"],
@@ -464,11 +631,37 @@ class SemanticMapper:
 
     def _map_children(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Map children nodes to UI elements"""
-        return [self._map_node(node) for node in nodes if self._map_node(node)]
+        result = []
+        # Containers need their children mapped first, so walk post-order with
+        # an explicit stack: (raw children iterator, mapped children, container)
+        stack = [(iter(nodes), result, None)]
+        while stack:
+            siblings, mapped, container = stack[-1]
+            for node in siblings:
+                if node["type"] in _CONTAINER_TYPES:
+                    element = self._map_button(node)
+                    if not element:
+                        # Map its children first; the layout is built on the
+                        # way back up, when their iterator runs out
+                        stack.append((iter(node.get("children", [])), [], node))
+                        break
+                else:
+                    element = self._map_node(node)
+                if element:
+                    mapped.append(element)
+            else:
+                stack.pop()
+                if container is not None:
+                    element = self._map_layout(container, mapped)
+                    if element:
+                        stack[-1][1].append(element)
+
+        return result
 
     def _map_node(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Map a single node to a UI element"""
-        node_type = node.get("type")
+        # Normalized nodes always carry id, name and type, so index directly
+        node_type = node["type"]
 
         if node_type == "TEXT":
             # Skip empty text
@@ -477,12 +670,7 @@ class SemanticMapper:
                 return None
 
             element = {"type": "text", "value": text_value}
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
+            self._copy_position(element, node)
             if node.get("fontSize"):
                 element["size"] = node["fontSize"]
             if node.get("fontWeight"):
@@ -498,24 +686,21 @@ class SemanticMapper:
         elif node_type == "ICON":
             element = {
                 "type": "icon",
-                "name": node.get("iconName", node.get("name", "icon")),
+                "name": node["iconName"],
             }
-            if node.get("id"):
+            if node["id"]:
                 element["id"] = node["id"]
             if node.get("url"):
                 element["url"] = node.get("url")
-            if node.get("width"):
-                element["width"] = node["width"]
-            if node.get("height"):
-                element["height"] = node["height"]
+            self._copy_size(element, node)
             return element
 
         elif node_type == "IMAGE":
             element = {
                 "type": "image",
-                "name": node.get("imageRef", node.get("name", "image")),
+                "name": node["imageRef"],
             }
-            if node.get("id"):
+            if node["id"]:
                 element["id"] = node["id"]
             if node.get("url"):
                 element["url"] = node.get("url")
@@ -524,10 +709,7 @@ class SemanticMapper:
                 element["path"] = (
                     f"assets/images/{node.get('imageRef', node.get('name', 'image'))}.png"
                 )
-            if node.get("width"):
-                element["width"] = node["width"]
-            if node.get("height"):
-                element["height"] = node["height"]
+            self._copy_size(element, node)
             # include basic position when available
             if node.get("x") is not None:
                 element["x"] = node["x"]
@@ -537,104 +719,111 @@ class SemanticMapper:
 
         elif node_type == "RECTANGLE":
             element = {"type": "container"}
-            if node.get("width"):
-                element["width"] = node["width"]
-            if node.get("height"):
-                element["height"] = node["height"]
+            self._copy_size(element, node)
             if node.get("fillColor"):
                 element["background"] = node["fillColor"]
             if node.get("cornerRadius"):
                 element["radius"] = node["cornerRadius"]
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
+            self._copy_position(element, node)
             return element
 
-        elif node_type in ["FRAME", "COMPONENT", "INSTANCE", "GROUP"]:
-            # Handle icon/image frames without children
-            children = self._map_children(node.get("children", []))
+        elif node_type in _CONTAINER_TYPES:
+            button = self._map_button(node)
+            if button:
+                return button
+            return self._map_layout(node, self._map_children(node.get("children", [])))
 
-            # Simple button heuristic: a frame with background + corner radius and a single prominent text child
-            text_children = [
-                c
-                for c in node.get("children", [])
-                if c.get("type") == "TEXT" and c.get("characters", "").strip()
-            ]
-            if (
-                node.get("backgroundColor")
-                and node.get("cornerRadius")
-                and text_children
-                and len(node.get("children", [])) <= 4
-            ):
-                # Use the first text child as label
-                label_node = text_children[0]
-                label = label_node.get("characters") or label_node.get("name") or ""
-                element = {
-                    "type": "button",
-                    "label": label.strip(),
-                }
-                if node.get("id"):
-                    element["id"] = node["id"]
-                if node.get("x") is not None:
-                    element["x"] = node["x"]
-                if node.get("y") is not None:
-                    element["y"] = node["y"]
-                if node.get("backgroundColor"):
-                    element["background"] = node.get("backgroundColor")
-                if node.get("cornerRadius"):
-                    element["radius"] = node.get("cornerRadius")
-                if node.get("width"):
-                    element["width"] = node.get("width")
-                if node.get("height"):
-                    element["height"] = node.get("height")
-                return element
-
-            # If it's empty and looks like an icon/image, return it as such
-            if not children:
-                return None
+        return None
+
+    def _map_button(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map a container that looks like a button, if it does"""
+        # Simple button heuristic: a frame with background + corner radius and a single prominent text child
+        text_children = [
+            c
+            for c in node.get("children", [])
+            if c["type"] == "TEXT" and c.get("characters", "").strip()
+        ]
+        if (
+            node.get("backgroundColor")
+            and node.get("cornerRadius")
+            and text_children
+            and len(node.get("children", [])) <= 4
+        ):
+            # Use the first text child as label
+            label_node = text_children[0]
+            label = label_node.get("characters") or label_node["name"] or ""
+            element = {
+                "type": "button",
+                "label": label.strip(),
+            }
+            self._copy_position(element, node)
+            if node.get("backgroundColor"):
+                element["background"] = node.get("backgroundColor")
+            if node.get("cornerRadius"):
+                element["radius"] = node.get("cornerRadius")
+            self._copy_size(element, node)
+            return element
 
-            direction = self._infer_direction(node)
-            element = {"type": direction}
+        return None
 
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
+    def _map_layout(
+        self, node: Dict[str, Any], children: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Map a container to a layout element around its mapped children"""
+        # If it's empty and looks like an icon/image, return it as such
+        if not children:
+            return None
 
-            padding = self._infer_padding(node)
-            if padding:
-                element["padding"] = padding
+        direction = self._infer_direction(node)
+        element = {"type": direction}
+        self._copy_position(element, node)
 
-            if node.get("itemSpacing"):
-                element["spacing"] = node["itemSpacing"]
+        padding = self._infer_padding(node)
+        if padding:
+            element["padding"] = padding
 
-            alignment = self._infer_alignment(node)
-            if alignment:
-                element["alignment"] = alignment
+        if node.get("itemSpacing"):
+            element["spacing"] = node["itemSpacing"]
 
-            if node.get("backgroundColor"):
-                element["background"] = node["backgroundColor"]
+        alignment = self._infer_alignment(node)
+        if alignment:
+            element["alignment"] = alignment
 
-            if node.get("cornerRadius"):
-                element["radius"] = node["cornerRadius"]
+        if node.get("backgroundColor"):
+            element["background"] = node["backgroundColor"]
 
-            if node.get("width"):
-                element["width"] = node["width"]
+        if node.get("cornerRadius"):
+            element["radius"] = node["cornerRadius"]
 
-            if node.get("height"):
-                element["height"] = node["height"]
+        self._copy_size(element, node)
 
-            if children:
-                element["children"] = children
+        if children:
+            element["children"] = children
 
-            return element
+        return element
 
-        return None
+    @staticmethod
+    def _copy_position(element: Dict[str, Any], node: Dict[str, Any]) -> None:
+        """Copy the node's id and x/y onto an element, when present"""
+        node_id = node["id"]
+        if node_id:
+            element["id"] = node_id
+        x = node.get("x")
+        if x is not None:
+            element["x"] = x
+        y = node.get("y")
+        if y is not None:
+            element["y"] = y
+
+    @staticmethod
+    def _copy_size(element: Dict[str, Any], node: Dict[str, Any]) -> None:
+        """Copy the node's width/height onto an element, when set"""
+        width = node.get("width")
+        if width:
+            element["width"] = width
+        height = node.get("height")
+        if height:
+            element["height"] = height
 
     @staticmethod
     def _infer_direction(node: Dict[str, Any]) -> str:
@@ -649,16 +838,29 @@ class SemanticMapper:
     @staticmethod
     def _infer_padding(node: Dict[str, Any]) -> Optional[float]:
         """Infer average padding from node"""
-        paddings = [
-            node.get("paddingLeft"),
-            node.get("paddingRight"),
-            node.get("paddingTop"),
-            node.get("paddingBottom"),
-        ]
-        paddings = [p for p in paddings if p is not None]
-
-        if paddings:
-            return sum(paddings) / len(paddings)
+        # Unrolled: runs for every layout frame, and this avoids building
+        # two throwaway lists per call
+        total = 0.0
+        count = 0
+        padding = node.get("paddingLeft")
+        if padding is not None:
+            total += padding
+            count += 1
+        padding = node.get("paddingRight")
+        if padding is not None:
+            total += padding
+            count += 1
+        padding = node.get("paddingTop")
+        if padding is not None:
+            total += padding
+            count += 1
+        padding = node.get("paddingBottom")
+        if padding is not None:
+            total += padding
+            count += 1
+
+        if count:
+            return total / count
         return None
 
     @staticmethod
@@ -689,48 +891,154 @@ class YAMLConverter:
         print()
 
         written = 0
-        filename_counts = {}  # Track duplicate filenames
+        filename_counts = Counter()  # Track duplicate filenames
+
+        # Screens are independent, so large files are dumped in parallel;
+        # None means each screen is streamed to its file below instead
+        yaml_contents = None
+        if self._worth_parallel(screens):
+            yaml_contents = self._dump_parallel(screens)
 
-        for screen in screens:
-            yaml_content = self._convert_screen(screen)
+        for index, screen in enumerate(screens):
             base_filename = self._sanitize_filename(screen["name"])
 
             # Handle duplicate filenames by appending counter
-            if base_filename in filename_counts:
-                filename_counts[base_filename] += 1
-                filename = f"{base_filename}_{filename_counts[base_filename]}.yaml"
-            else:
-                filename_counts[base_filename] = 1
+            filename_counts[base_filename] += 1
+            count = filename_counts[base_filename]
+            if count == 1:
                 filename = f"{base_filename}.yaml"
+            else:
+                filename = f"{base_filename}_{count}.yaml"
 
             filepath = output_path / filename
 
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(yaml_content)
+            # Binary: the YAML is dumped already encoded as UTF-8
+            with open(filepath, "wb") as f:
+                if yaml_contents is None:
+                    self._convert_screen(screen, f, encoding="utf-8")
+                else:
+                    f.write(yaml_contents[index])
 
             print(f"   ✅ {filename}")
             written += 1
 
         return written
 
-    def _convert_screen(self, screen: Dict[str, Any]) -> str:
-        """Convert a screen to YAML string"""
-        output = {
-            "screen": {"name": screen["name"], "children": screen.get("children", [])}
-        }
+    def _convert_screen(
+        self,
+        screen: Dict[str, Any],
+        stream: Optional[IO] = None,
+        encoding: Optional[str] = None,
+    ) -> Optional[Union[str, bytes]]:
+        """Convert a screen to YAML, written to stream or returned
 
+        With an encoding the YAML is produced as bytes, for binary streams.
+        """
         return yaml.dump(
-            output, default_flow_style=False, sort_keys=False, allow_unicode=True
+            self._screen_document(screen),
+            stream,
+            encoding=encoding,
+            **_YAML_DUMP_OPTIONS,
         )
 
     @staticmethod
-    def _sanitize_filename(name: str) -> str:
-        """Sanitize filename"""
-        name = name.lower()
-        name = re.sub(r"[^\w\s-]", "", name)
-        name = re.sub(r"[\s_]+", "_", name)
-        name = name.strip("_")
-        return name
+    def _worth_parallel(screens: List[Dict[str, Any]]) -> bool:
+        """Check if screens hold enough elements to dump them in parallel"""
+        if len(screens) < 2 or (os.cpu_count() or 1) < 2:
+            return False
+
+        count = 0
+        stack = [screen.get("children", []) for screen in screens]
+        while stack:
+            children = stack.pop()
+            count += len(children)
+            if count >= _PARALLEL_MIN_ELEMENTS:
+                return True
+            for child in children:
+                if child.get("children"):
+                    stack.append(child["children"])
+
+        return False
+
+    def dump_screens(
+        self, screens: List[Dict[str, Any]], mp_context=None
+    ) -> List[bytes]:
+        """Dump each screen to UTF-8 YAML, in parallel when that pays off
+
+        mp_context picks how worker processes are started (e.g. spawn).
+        """
+        yaml_contents = None
+        if self._worth_parallel(screens):
+            yaml_contents = self._dump_parallel(screens, mp_context)
+        if yaml_contents is None:
+            yaml_contents = [
+                self._convert_screen(screen, encoding="utf-8") for screen in screens
+            ]
+        return yaml_contents
+
+    def _dump_parallel(
+        self, screens: List[Dict[str, Any]], mp_context=None
+    ) -> Optional[List[bytes]]:
+        """Dump screens to UTF-8 YAML across worker processes
+
+        Returns None if no process pool can run here, so callers dump serially.
+        """
+        # Workers run yaml.dump itself, so nothing from this module (which
+        # streamlit loads under another name) has to be importable there
+        dump = partial(yaml.dump, encoding="utf-8", **_YAML_DUMP_OPTIONS)
+        documents = [self._screen_document(screen) for screen in screens]
+        try:
+            with ProcessPoolExecutor(mp_context=mp_context) as pool:
+                return list(pool.map(dump, documents, chunksize=4))
+        except (BrokenProcessPool, OSError, NotImplementedError) as e:
+            # Sandboxes without /dev/shm or fork, or a killed worker
+            print(f"   ⚠️  Parallel dump unavailable ({e}), writing serially")
+            return None
+
+    @staticmethod
+    def _screen_document(screen: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap a screen in the top-level YAML structure"""
+        return {
+            "screen": {"name": screen["name"], "children": screen.get("children", [])}
+        }
+
+    _sanitize_filename = staticmethod(sanitize_name)
+
+
+def find_top_level_key(json_file: str, keys: Tuple[str, ...]) -> Optional[str]:
+    """Return the first of keys found at the top level of a JSON file"""
+    # Stops at the first match, so only the values ahead of it are parsed;
+    # the bulky parts of a Figma response sit under these keys
+    with open(json_file, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == "" and event == "map_key" and value in keys:
+                return value
+    return None
+
+
+def get_msgpack_cache(json_file: str) -> Optional[str]:
+    """Return the .msgpack cache written by step 1, if it is usable"""
+    cache_file = f"{json_file}.msgpack"
+    if not msgpack or not os.path.exists(cache_file):
+        return None
+
+    # Ignore a cache that is older than the JSON it was made from
+    if os.path.getmtime(cache_file) < os.path.getmtime(json_file):
+        return None
+
+    return cache_file
+
+
+def load_msgpack_cache(cache_file: str) -> Optional[Any]:
+    """Load the .msgpack cache, or return None if it is damaged"""
+    print(f"   📦 Loading MessagePack cache: {cache_file}")
+    try:
+        with open(cache_file, "rb") as f:
+            return msgpack.unpackb(f.read(), raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        # Truncated or corrupt; the JSON it was made from is still there
+        print(f"   ⚠️  Damaged MessagePack cache ({e}), loading the JSON instead")
+        return None
 
 
 def convert_figma_json(json_file: str, output_dir: str = "generated"):
@@ -740,6 +1048,7 @@ def convert_figma_json(json_file: str, output_dir: str = "generated"):
     print(f"📂 Loading: {json_file}")
     
     # Check file size before loading
+    size_mb = 0
     try:
         file_size = os.path.getsize(json_file)
         size_mb = file_size / (1024 * 1024)
@@ -753,21 +1062,46 @@ def convert_figma_json(json_file: str, output_dir: str = "generated"):
             print("   ⚠️  WARNING: Very large file!")
             print("   💡 Consider using a specific node-id instead of downloading the entire file")
             print("   💡 You can add '?node-id=X:Y' to your Figma URL")
-            response = input("   Continue anyway? (y/n): ").strip().lower()
-            if response != 'y':
-                print("   ❌ Cancelled by user")
-                sys.exit(0)
+            # Only ask when someone can answer; scripts and servers would
+            # otherwise block forever on stdin
+            if (
+                sys.stdin
+                and sys.stdin.isatty()
+                and not os.environ.get("FIGMA_AUTO_YES")
+            ):
+                response = input("   Continue anyway? (y/n): ").strip().lower()
+                if response != 'y':
+                    print("   ❌ Cancelled by user")
+                    sys.exit(0)
+            else:
+                print("   ▶️  Non-interactive run, continuing")
     except OSError:
         pass  # File not found, will be caught below
     
+    # Stays None when a large full document is streamed page by page instead
+    figma_data = None
+
     try:
-        print("   🔄 Loading JSON into memory...")
-        with open(json_file, "r", encoding="utf-8") as f:
-            figma_data = json.load(f)
+        cache_file = get_msgpack_cache(json_file)
+        if cache_file:
+            figma_data = load_msgpack_cache(cache_file)
+
+        if figma_data is None:
+            if (
+                ijson
+                and size_mb > 50
+                and find_top_level_key(json_file, ("document", "nodes")) == "document"
+            ):
+                # Specific node requests have no document pages to stream
+                print("   🌊 Full document, streaming it page by page")
+            else:
+                print("   🔄 Loading JSON into memory...")
+                with open(json_file, "rb") as f:
+                    figma_data = orjson.loads(f.read()) if orjson else json.load(f)
     except FileNotFoundError:
         print(f"❌ Error: File not found: {json_file}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except _JSON_ERRORS as e:
         print(f"❌ Error: Invalid JSON: {str(e)}")
         sys.exit(1)
     except MemoryError:
@@ -778,844 +1112,24 @@ def convert_figma_json(json_file: str, output_dir: str = "generated"):
         print("   3. Running on a machine with more RAM")
         sys.exit(1)
 
-    print("   ✅ JSON loaded successfully")
+    if figma_data is not None:
+        print("   ✅ JSON loaded successfully")
     print()
 
     # Normalize
     print("🔄 Processing Figma data...")
     normalizer = FigmaNormalizer()
-    normalized_nodes = normalizer.normalize(figma_data)
-
-    print(f"   ✅ Found {len(normalized_nodes)} root node(s)")
-
-    if not normalized_nodes:
-        print()
-        print("⚠️  No nodes found to convert")
-        print("💡 The JSON might be empty or have an unexpected structure")
-        sys.exit(1)
-
-    # Show what was found
-    print()
-    for node in normalized_nodes:
-        children_count = len(node.get("children", []))
-        print(f"   📄 \"{node['name']}\" ({node['type']}, {children_count} children)")
-    print()
-
-    # Map to screens
-    mapper = SemanticMapper()
-    screens = mapper.map_to_screens(normalized_nodes)
-
-    print(f"   ✅ Identified {len(screens)} screen(s)")
-
-    if not screens:
-        print()
-        print("⚠️  No screens found to convert")
-        print("💡 The nodes might not contain UI elements")
-        sys.exit(1)
-
-    print()
-
-    # Convert to YAML
-    converter = YAMLConverter()
-    written = converter.convert_all(screens, output_dir)
-
-    print()
-    print("=" * 60)
-    print(f"✅ Success! Generated {written} YAML file(s)")
-    print(f"📁 Location: {Path(output_dir).absolute()}")
-    print("=" * 60)
-
-
-def main():
-    print_header()
-
-    # Get JSON filename
-    if len(sys.argv) > 1:
-        json_file = sys.argv[1]
-    else:
-        print("📂 Enter the path to your Figma JSON file:")
-        print("   Example: figma_file.json")
-        json_file = input("   File: ").strip()
-        print()
-
-    if not json_file:
-        print("❌ Error: JSON file is required")
-        print()
-        print("Usage: python 2_convert_to_yaml.py <json_file>")
-        sys.exit(1)
-
-    # Optional: Custom output directory
-    if len(sys.argv) > 2:
-        output_dir = sys.argv[2]
+    if figma_data is None:
+        try:
+            # Only one page is held in memory at a time
+            with open(json_file, "rb") as f:
+                pages = ijson.items(f, "document.children.item", use_float=True)
+                normalized_nodes = normalizer.normalize_pages(pages)
+        except _JSON_ERRORS as e:
+            print(f"❌ Error: Invalid JSON: {str(e)}")
+            sys.exit(1)
     else:
-        output_dir = "generated"
-
-    print("=" * 60)
-    print()
-
-    # Convert
-    convert_figma_json(json_file, output_dir)
-
-
-if __name__ == "__main__":
-    main()
-=======
-#!/usr/bin/env python3
-"""
-Step 2: Convert Figma JSON to YAML
-Converts downloaded Figma JSON file into clean YAML structure
-"""
-
-import os
-import sys
-import json
-import yaml
-import re
-from pathlib import Path
-from typing import Dict, List, Optional, Any
-
-
-def print_header():
-    print("=" * 60)
-    print("STEP 2: Convert Figma JSON to YAML")
-    print("=" * 60)
-    print()
-
-
-class FigmaNormalizer:
-    """Normalizes and filters Figma JSON to essential UI properties"""
-
-    def __init__(self, figma_file_key: str = None):
-        """Initialize with optional Figma file key for asset URLs"""
-        self.figma_file_key = figma_file_key
-
-    def normalize(self, figma_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Normalize Figma data structure"""
-
-        print("🔍 Analyzing JSON structure...")
-
-        # Handle node-id specific requests
-        if "nodes" in figma_data:
-            print("   📌 Found specific node request")
-            result = []
-            for node_id, node_data in figma_data["nodes"].items():
-                if "document" in node_data:
-                    document = node_data["document"]
-                    normalized = self._normalize_node(document)
-                    if normalized:
-                        result.append(normalized)
-            return result
-
-        # Handle full document requests
-        if "document" in figma_data:
-            print("   📄 Found full document")
-            document = figma_data["document"]
-            return self._normalize_children(document)
-
-        print("   ⚠️  Unexpected JSON structure")
-        return []
-
-    def _normalize_children(self, node: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Normalize all children of a node"""
-        if "children" not in node:
-            return []
-
-        result = []
-        for child in node["children"]:
-            # Skip CANVAS nodes, but process their children
-            if child.get("type") == "CANVAS":
-                # Recursively get children from canvas
-                canvas_children = self._normalize_children(child)
-                result.extend(canvas_children)
-            else:
-                normalized = self._normalize_node(child)
-                if normalized:
-                    result.append(normalized)
-
-        return result
-
-    def _generate_asset_url(
-        self, node_id: str, name: str, asset_type: str = "image"
-    ) -> str:
-        """
-        Generate Flutter-friendly asset URL for icons and images.
-
-        Args:
-            node_id: Figma node ID
-            name: Asset name
-            asset_type: "image" or "icon"
-
-        Returns:
-            Asset URL path suitable for Flutter
-        """
-        # Sanitize name for URL
-        safe_name = self._sanitize_name(name)
-
-        # Some Figma default layer names are generic (e.g. "Vector", "Rectangle").
-        # To avoid collisions when many layers share the same generic name,
-        # append a sanitized node id suffix for uniqueness.
-        generic_names = {
-            "vector",
-            "rectangle",
-            "ellipse",
-            "shape",
-            "image",
-            "unnamed",
-            "layer",
-        }
-        if not safe_name or safe_name in generic_names:
-            id_suffix = re.sub(r"[^0-9A-Za-z]+", "_", str(node_id))
-            safe_name = f"{safe_name or 'asset'}_{id_suffix}"
-
-        # Return Flutter asset path format
-        if asset_type == "icon":
-            return f"assets/icons/{safe_name}.svg"
-        else:  # image
-            return f"assets/images/{safe_name}.png"
-
-    @staticmethod
-    def _sanitize_name(name: str) -> str:
-        """Sanitize asset name for file paths"""
-        # Convert to lowercase, replace spaces and special chars with underscores
-        name = name.lower()
-        name = re.sub(r"[^\w\s-]", "", name)
-        name = re.sub(r"[\s_]+", "_", name)
-        name = name.strip("_")
-        return name
-
-    def _normalize_node(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Normalize a single node"""
-        node_type = node.get("type")
-        node_id = node.get("id")
-        name = node.get("name", "Unnamed")
-
-        # Get bounding box
-        bounds = node.get("absoluteBoundingBox", {})
-        x = bounds.get("x")
-        y = bounds.get("y")
-        width = bounds.get("width")
-        height = bounds.get("height")
-        # Common visual properties
-        opacity = node.get("opacity")
-        strokes = node.get("strokes")
-        stroke_weight = node.get("strokeWeight")
-        effects = node.get("effects")
-        visible = node.get("visible", True)
-
-        # Detect icons and images by name patterns and visual characteristics
-        name_lower = name.lower()
-        is_icon = any(
-            keyword in name_lower
-            for keyword in [
-                "icon",
-                "logo",
-                "arrow",
-                "check",
-                "close",
-                "menu",
-                "search",
-                "heart",
-                "star",
-                "home",
-                "profile",
-                "settings",
-                "notification",
-                "back",
-                "forward",
-                "play",
-                "pause",
-                "stop",
-                "edit",
-                "delete",
-                "add",
-                "plus",
-                "minus",
-                "refresh",
-                "share",
-                "download",
-                "upload",
-                "li:",
-                "ic_",
-                "ico_",
-                "btn_",
-                "img_icon",
-                "icon_",
-            ]
-        )
-
-        is_image = any(
-            keyword in name_lower
-            for keyword in [
-                "image",
-                "photo",
-                "picture",
-                "img",
-                "illustration",
-                "graphic",
-                "avatar",
-                "thumbnail",
-                "banner",
-                "hero",
-                "bg_",
-                "background",
-            ]
-        )
-
-        # Also detect icons/images by small size (likely icons) or by having image fills
-        has_image_fill = False
-        fills = node.get("fills", [])
-        if fills and isinstance(fills, list):
-            for fill in fills:
-                if fill.get("type") == "IMAGE":
-                    has_image_fill = True
-                    break
-
-        # Small elements are likely icons
-        if not is_icon and width and height:
-            if (
-                width <= 64
-                and height <= 64
-                and (node_type in ["VECTOR", "ELLIPSE", "FRAME"])
-            ):
-                is_icon = True
-
-        # Handle different node types
-        if node_type in ["FRAME", "COMPONENT", "INSTANCE", "GROUP"]:
-            # If it's an icon-like frame with no text children, mark as icon
-            if (is_icon or has_image_fill) and not self._has_text_children(node):
-                if has_image_fill:
-                    return {
-                        "id": node_id,
-                        "name": name,
-                        "type": "IMAGE",
-                        "x": x,
-                        "y": y,
-                        "width": width,
-                        "height": height,
-                        "imageRef": name,
-                        "imageId": node_id,
-                        "url": self._generate_asset_url(node_id, name, "image"),
-                        "children": [],
-                    }
-                else:
-                    return {
-                        "id": node_id,
-                        "name": name,
-                        "type": "ICON",
-                        "x": x,
-                        "y": y,
-                        "width": width,
-                        "height": height,
-                        "iconName": name,
-                        "iconId": node_id,
-                        "url": self._generate_asset_url(node_id, name, "icon"),
-                        "children": [],
-                    }
-
-            # If it's an image-like frame, mark as image
-            if is_image and not self._has_text_children(node):
-                return {
-                    "id": node_id,
-                    "name": name,
-                    "type": "IMAGE",
-                    "x": x,
-                    "y": y,
-                    "width": width,
-                    "height": height,
-                    "imageRef": name,
-                    "imageId": node_id,
-                    "url": self._generate_asset_url(node_id, name, "image"),
-                    "children": [],
-                }
-
-            return {
-                "id": node_id,
-                "name": name,
-                "type": node_type,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height,
-                "opacity": opacity,
-                "strokes": strokes,
-                "strokeWeight": stroke_weight,
-                "effects": effects,
-                "visible": visible,
-                "layoutMode": node.get("layoutMode"),
-                "paddingLeft": node.get("paddingLeft"),
-                "paddingRight": node.get("paddingRight"),
-                "paddingTop": node.get("paddingTop"),
-                "paddingBottom": node.get("paddingBottom"),
-                "itemSpacing": node.get("itemSpacing"),
-                "primaryAxisAlignItems": node.get("primaryAxisAlignItems"),
-                "counterAxisAlignItems": node.get("counterAxisAlignItems"),
-                "backgroundColor": self._extract_color(node.get("backgroundColor")),
-                "cornerRadius": node.get("cornerRadius"),
-                "children": self._normalize_children(node),
-            }
-
-        elif node_type == "TEXT":
-            return {
-                "id": node_id,
-                "name": name,
-                "type": node_type,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height,
-                "characters": node.get("characters", ""),
-                "fontSize": self._extract_font_size(node.get("style")),
-                "fontWeight": node.get("style", {}).get("fontWeight"),
-                "fontFamily": node.get("style", {}).get("fontFamily"),
-                "textAlignHorizontal": node.get("style", {}).get("textAlignHorizontal"),
-                "color": self._extract_fill_color(node.get("fills")),
-                "lineHeight": self._extract_line_height(node.get("style")),
-                "letterSpacing": node.get("style", {}).get("letterSpacing"),
-                "style": node.get("style"),
-                "opacity": opacity,
-                "visible": visible,
-            }
-
-        elif node_type == "RECTANGLE":
-            return {
-                "id": node_id,
-                "name": name,
-                "type": node_type,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height,
-                "fillColor": self._extract_fill_color(node.get("fills")),
-                "cornerRadius": node.get("cornerRadius"),
-                "opacity": opacity,
-                "strokes": strokes,
-                "strokeWeight": stroke_weight,
-                "effects": effects,
-                "visible": visible,
-            }
-
-        elif node_type in [
-            "VECTOR",
-            "ELLIPSE",
-            "LINE",
-            "POLYGON",
-            "STAR",
-            "BOOLEAN_OPERATION",
-        ]:
-            # Check if it's an image fill
-            fills = node.get("fills", [])
-            if fills and isinstance(fills, list) and len(fills) > 0:
-                first_fill = fills[0]
-                if first_fill.get("type") == "IMAGE":
-                    return {
-                        "id": node_id,
-                        "name": name,
-                        "type": "IMAGE",
-                        "x": x,
-                        "y": y,
-                        "width": width,
-                        "height": height,
-                        "imageRef": first_fill.get("imageRef") or name,
-                        "imageId": node_id,
-                        "url": self._generate_asset_url(node_id, name, "image"),
-                    }
-
-            # Otherwise treat as icon
-            if is_icon or node_type in ["VECTOR", "ELLIPSE"]:
-                return {
-                    "id": node_id,
-                    "name": name,
-                    "type": "ICON",
-                    "x": x,
-                    "y": y,
-                    "width": width,
-                    "height": height,
-                    "iconName": name,
-                    "iconId": node_id,
-                    "url": self._generate_asset_url(node_id, name, "icon"),
-                    "children": [],
-                }
-
-        return None
-
-    def _has_text_children(self, node: Dict[str, Any]) -> bool:
-        """Check if node has any text children"""
-        children = node.get("children", [])
-        for child in children:
-            if child.get("type") == "TEXT":
-                return True
-            if child.get("children"):
-                if self._has_text_children(child):
-                    return True
-        return False
-
-    @staticmethod
-    def _extract_color(color_data: Optional[Dict[str, Any]]) -> Optional[str]:
-        """Extract color as hex string"""
-        if not color_data:
-            return None
-
-        r = int(color_data.get("r", 0) * 255)
-        g = int(color_data.get("g", 0) * 255)
-        b = int(color_data.get("b", 0) * 255)
-
-        return f"#{r:02X}{g:02X}{b:02X}"
-
-    @staticmethod
-    def _extract_fill_color(fills: Optional[List[Dict[str, Any]]]) -> Optional[str]:
-        """Extract fill color from fills array"""
-        if not fills or not isinstance(fills, list) or len(fills) == 0:
-            return None
-
-        first_fill = fills[0]
-        if first_fill.get("type") == "SOLID":
-            return FigmaNormalizer._extract_color(first_fill.get("color"))
-
-        return None
-
-    @staticmethod
-    def _extract_font_size(style: Optional[Dict[str, Any]]) -> Optional[float]:
-        """Extract font size from style"""
-        if not style:
-            return None
-        return style.get("fontSize")
-
-    @staticmethod
-    def _extract_line_height(style: Optional[Dict[str, Any]]) -> Optional[float]:
-        """Extract line height from style"""
-        if not style:
-            return None
-        return style.get("lineHeightPx")
-
-
-class SemanticMapper:
-    """Maps normalized nodes to semantic UI concepts"""
-
-    def map_to_screens(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Convert normalized nodes to screen structures"""
-        print("🎨 Mapping UI elements...")
-
-        screens = []
-
-        for node in nodes:
-            # If the node is a Frame/Component with children, treat it as a screen
-            if node.get("type") in ["FRAME", "COMPONENT", "INSTANCE"] and node.get(
-                "children"
-            ):
-                screens.append(
-                    {
-                        "name": node["name"],
-                        "children": self._map_children(node["children"]),
-                    }
-                )
-            # If it has children that are frames, treat each as a screen
-            elif node.get("children"):
-                for child in node["children"]:
-                    if child.get("type") in ["FRAME", "COMPONENT", "INSTANCE"]:
-                        screens.append(
-                            {
-                                "name": child["name"],
-                                "children": self._map_children(
-                                    child.get("children", [])
-                                ),
-                            }
-                        )
-
-        return screens
-
-    def _map_children(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Map children nodes to UI elements"""
-        return [self._map_node(node) for node in nodes if self._map_node(node)]
-
-    def _map_node(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Map a single node to a UI element"""
-        node_type = node.get("type")
-
-        if node_type == "TEXT":
-            # Skip empty text
-            text_value = node.get("characters", "").strip()
-            if not text_value:
-                return None
-
-            element = {"type": "text", "value": text_value}
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
-            if node.get("fontSize"):
-                element["size"] = node["fontSize"]
-            if node.get("fontWeight"):
-                element["fontWeight"] = node["fontWeight"]
-            if node.get("fontFamily"):
-                element["fontFamily"] = node["fontFamily"]
-            if node.get("color"):
-                element["color"] = node["color"]
-            if node.get("textAlignHorizontal"):
-                element["align"] = node["textAlignHorizontal"].lower()
-            return element
-
-        elif node_type == "ICON":
-            element = {
-                "type": "icon",
-                "name": node.get("iconName", node.get("name", "icon")),
-            }
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("url"):
-                element["url"] = node.get("url")
-            if node.get("width"):
-                element["width"] = node["width"]
-            if node.get("height"):
-                element["height"] = node["height"]
-            return element
-
-        elif node_type == "IMAGE":
-            element = {
-                "type": "image",
-                "name": node.get("imageRef", node.get("name", "image")),
-            }
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("url"):
-                element["url"] = node.get("url")
-            else:
-                # Fallback to old path format if no URL
-                element["path"] = (
-                    f"assets/images/{node.get('imageRef', node.get('name', 'image'))}.png"
-                )
-            if node.get("width"):
-                element["width"] = node["width"]
-            if node.get("height"):
-                element["height"] = node["height"]
-            # include basic position when available
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
-            return element
-
-        elif node_type == "RECTANGLE":
-            element = {"type": "container"}
-            if node.get("width"):
-                element["width"] = node["width"]
-            if node.get("height"):
-                element["height"] = node["height"]
-            if node.get("fillColor"):
-                element["background"] = node["fillColor"]
-            if node.get("cornerRadius"):
-                element["radius"] = node["cornerRadius"]
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
-            return element
-
-        elif node_type in ["FRAME", "COMPONENT", "INSTANCE", "GROUP"]:
-            # Handle icon/image frames without children
-            children = self._map_children(node.get("children", []))
-
-            # Simple button heuristic: a frame with background + corner radius and a single prominent text child
-            text_children = [
-                c
-                for c in node.get("children", [])
-                if c.get("type") == "TEXT" and c.get("characters", "").strip()
-            ]
-            if (
-                node.get("backgroundColor")
-                and node.get("cornerRadius")
-                and text_children
-                and len(node.get("children", [])) <= 4
-            ):
-                # Use the first text child as label
-                label_node = text_children[0]
-                label = label_node.get("characters") or label_node.get("name") or ""
-                element = {
-                    "type": "button",
-                    "label": label.strip(),
-                }
-                if node.get("id"):
-                    element["id"] = node["id"]
-                if node.get("x") is not None:
-                    element["x"] = node["x"]
-                if node.get("y") is not None:
-                    element["y"] = node["y"]
-                if node.get("backgroundColor"):
-                    element["background"] = node.get("backgroundColor")
-                if node.get("cornerRadius"):
-                    element["radius"] = node.get("cornerRadius")
-                if node.get("width"):
-                    element["width"] = node.get("width")
-                if node.get("height"):
-                    element["height"] = node.get("height")
-                return element
-
-            # If it's empty and looks like an icon/image, return it as such
-            if not children:
-                return None
-
-            direction = self._infer_direction(node)
-            element = {"type": direction}
-
-            if node.get("id"):
-                element["id"] = node["id"]
-            if node.get("x") is not None:
-                element["x"] = node["x"]
-            if node.get("y") is not None:
-                element["y"] = node["y"]
-
-            padding = self._infer_padding(node)
-            if padding:
-                element["padding"] = padding
-
-            if node.get("itemSpacing"):
-                element["spacing"] = node["itemSpacing"]
-
-            alignment = self._infer_alignment(node)
-            if alignment:
-                element["alignment"] = alignment
-
-            if node.get("backgroundColor"):
-                element["background"] = node["backgroundColor"]
-
-            if node.get("cornerRadius"):
-                element["radius"] = node["cornerRadius"]
-
-            if node.get("width"):
-                element["width"] = node["width"]
-
-            if node.get("height"):
-                element["height"] = node["height"]
-
-            if children:
-                element["children"] = children
-
-            return element
-
-        return None
-
-    @staticmethod
-    def _infer_direction(node: Dict[str, Any]) -> str:
-        """Infer layout direction from node"""
-        layout_mode = node.get("layoutMode")
-        if layout_mode == "VERTICAL":
-            return "column"
-        elif layout_mode == "HORIZONTAL":
-            return "row"
-        return "stack"
-
-    @staticmethod
-    def _infer_padding(node: Dict[str, Any]) -> Optional[float]:
-        """Infer average padding from node"""
-        paddings = [
-            node.get("paddingLeft"),
-            node.get("paddingRight"),
-            node.get("paddingTop"),
-            node.get("paddingBottom"),
-        ]
-        paddings = [p for p in paddings if p is not None]
-
-        if paddings:
-            return sum(paddings) / len(paddings)
-        return None
-
-    @staticmethod
-    def _infer_alignment(node: Dict[str, Any]) -> Optional[str]:
-        """Infer alignment from node"""
-        align = node.get("primaryAxisAlignItems")
-        if align == "CENTER":
-            return "center"
-        elif align == "MIN":
-            return "start"
-        elif align == "MAX":
-            return "end"
-        return None
-
-
-class YAMLConverter:
-    """Converts UI screens to clean YAML format"""
-
-    def convert_all(
-        self, screens: List[Dict[str, Any]], output_dir: str = "generated"
-    ) -> int:
-        """Convert all screens to YAML files"""
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
-
-        print(f"📝 Converting to YAML...")
-        print(f"   Output directory: {output_dir}")
-        print()
-
-        written = 0
-        filename_counts = {}  # Track duplicate filenames
-
-        for screen in screens:
-            yaml_content = self._convert_screen(screen)
-            base_filename = self._sanitize_filename(screen["name"])
-
-            # Handle duplicate filenames by appending counter
-            if base_filename in filename_counts:
-                filename_counts[base_filename] += 1
-                filename = f"{base_filename}_{filename_counts[base_filename]}.yaml"
-            else:
-                filename_counts[base_filename] = 1
-                filename = f"{base_filename}.yaml"
-
-            filepath = output_path / filename
-
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(yaml_content)
-
-            print(f"   ✅ {filename}")
-            written += 1
-
-        return written
-
-    def _convert_screen(self, screen: Dict[str, Any]) -> str:
-        """Convert a screen to YAML string"""
-        output = {
-            "screen": {"name": screen["name"], "children": screen.get("children", [])}
-        }
-
-        return yaml.dump(
-            output, default_flow_style=False, sort_keys=False, allow_unicode=True
-        )
-
-    @staticmethod
-    def _sanitize_filename(name: str) -> str:
-        """Sanitize filename"""
-        name = name.lower()
-        name = re.sub(r"[^\w\s-]", "", name)
-        name = re.sub(r"[\s_]+", "_", name)
-        name = name.strip("_")
-        return name
-
-
-def convert_figma_json(json_file: str, output_dir: str = "generated"):
-    """Main conversion function"""
-
-    # Load JSON
-    print(f"📂 Loading: {json_file}")
-    try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            figma_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ Error: File not found: {json_file}")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON: {str(e)}")
-        sys.exit(1)
-
-    print("   ✅ JSON loaded successfully")
-    print()
-
-    # Normalize
-    print("🔄 Processing Figma data...")
-    normalizer = FigmaNormalizer()
-    normalized_nodes = normalizer.normalize(figma_data)
+        normalized_nodes = normalizer.normalize(figma_data)
 
     print(f"   ✅ Found {len(normalized_nodes)} root node(s)")
 
@@ -1690,4 +1204,3 @@ def main():
 
 if __name__ == "__main__":
     main()
->>>>>>> 7f8c21ed401cad84e5bd773bf2ed8098230a339e
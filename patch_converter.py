@@ -5,17 +5,13 @@ Patch script to update 2_convert_to_yaml.py for better handling of large files
 
 import sys
 import os
+import mmap
 
 # Set UTF-8 encoding for console output
 if sys.platform == 'win32':
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
 
-# Read the original file
-print("Reading 2_convert_to_yaml.py...")
-with open('2_convert_to_yaml.py', 'r', encoding='utf-8') as f:
-    content = f.read()
-
 # Find and replace the convert_figma_json function's JSON loading section
 old_code = '''    # Load JSON
     print(f"📂 Loading: {json_file}")
@@ -49,10 +45,19 @@ new_code = '''    # Load JSON
             print("   ⚠️  WARNING: Very large file!")
             print("   💡 Consider using a specific node-id instead of downloading the entire file")
             print("   💡 You can add '?node-id=X:Y' to your Figma URL")
-            response = input("   Continue anyway? (y/n): ").strip().lower()
-            if response != 'y':
-                print("   ❌ Cancelled by user")
-                sys.exit(0)
+            # Only ask when someone can answer; scripts and servers would
+            # otherwise block forever on stdin
+            if (
+                sys.stdin
+                and sys.stdin.isatty()
+                and not os.environ.get("FIGMA_AUTO_YES")
+            ):
+                response = input("   Continue anyway? (y/n): ").strip().lower()
+                if response != 'y':
+                    print("   ❌ Cancelled by user")
+                    sys.exit(0)
+            else:
+                print("   ▶️  Non-interactive run, continuing")
     except OSError:
         pass  # File not found, will be caught below
     
@@ -77,14 +82,24 @@ new_code = '''    # Load JSON
     print("   ✅ JSON loaded successfully")
     print()'''
 
+# Find the target code in the original file, searching the raw bytes once
+print("Reading 2_convert_to_yaml.py...")
+old_bytes = old_code.encode('utf-8')
+content = None
+with open('2_convert_to_yaml.py', 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        index = mm.find(old_bytes)
+        if index != -1:
+            content = mm[:index] + new_code.encode('utf-8') + mm[index + len(old_bytes):]
+
 # Replace
-if old_code in content:
-    content = content.replace(old_code, new_code)
+if content is not None:
     print("✅ Successfully updated the code")
     
-    # Write back
-    with open('2_convert_to_yaml.py', 'w', encoding='utf-8') as f:
+    # Write back atomically: a failed write never leaves a half-patched file
+    with open('2_convert_to_yaml.py.tmp', 'wb') as f:
         f.write(content)
+    os.replace('2_convert_to_yaml.py.tmp', '2_convert_to_yaml.py')
     
     print("✅ File 2_convert_to_yaml.py updated successfully!")
 else:
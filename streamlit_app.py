@@ -7,26 +7,50 @@ Beautiful UI for converting Figma designs to YAML files
 import streamlit as st
 import os
 import json
+import mmap
+import multiprocessing
 import requests
 import re
-import yaml
 import tempfile
 import zipfile
+from collections import Counter
 from pathlib import Path
 from io import BytesIO
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Fall back to parsing the whole response at once
+    ijson = None
 
 # Import the converter classes
 from importlib.util import spec_from_file_location, module_from_spec
 
+
+@st.cache_resource
+def load_converter():
+    """Load the converter module once, instead of on every script rerun"""
+    spec = spec_from_file_location("converter", "2_convert_to_yaml.py")
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 # Load the converter module
-spec = spec_from_file_location("converter", "2_convert_to_yaml.py")
-converter_module = module_from_spec(spec)
-spec.loader.exec_module(converter_module)
+converter_module = load_converter()
 
 FigmaNormalizer = converter_module.FigmaNormalizer
 SemanticMapper = converter_module.SemanticMapper
 YAMLConverter = converter_module.YAMLConverter
+sanitize_name = converter_module.sanitize_name  # Same filenames as step 2
+
+# Both /design/ and /file/ URLs, matched in a single search
+_FILE_KEY_RE = re.compile(r"figma\.com/(?:design|file)/([a-zA-Z0-9]+)")
 
 
 def set_page_config():
@@ -104,23 +128,18 @@ def apply_custom_css():
 
 def get_file_key_from_url(url: str) -> str:
     """Extract file key from Figma URL"""
-    patterns = [
-        r"figma\.com/design/([a-zA-Z0-9]+)",
-        r"figma\.com/file/([a-zA-Z0-9]+)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = _FILE_KEY_RE.search(url)
+    if match:
+        return match.group(1)
     raise ValueError("Invalid Figma URL format")
 
 
-def download_figma_file(token: str, file_key: str) -> Dict[str, Any]:
-    """Download Figma file via API"""
+def download_figma_file(token: str, file_key: str) -> Iterator[Dict[str, Any]]:
+    """Download Figma file via API, returning its pages as they arrive"""
     url = f"https://api.figma.com/v1/files/{file_key}"
     headers = {"X-Figma-Token": token, "Content-Type": "application/json"}
 
-    response = requests.get(url, headers=headers, timeout=60)
+    response = requests.get(url, headers=headers, timeout=60, stream=True)
 
     if response.status_code == 401:
         raise Exception("Invalid Figma token. Get your token from: https://www.figma.com/settings")
@@ -131,13 +150,46 @@ def download_figma_file(token: str, file_key: str) -> Dict[str, Any]:
     elif response.status_code != 200:
         raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
 
-    return response.json()
+    return iter_pages(response)
 
 
-def convert_to_yaml(figma_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Convert Figma JSON to YAML files"""
+def iter_pages(response: requests.Response) -> Iterator[Dict[str, Any]]:
+    """Yield the document's pages from a streamed API response"""
+    with response:
+        if ijson:
+            # Parse while downloading; only one page is in memory at a time
+            response.raw.decode_content = True
+            yield from ijson.items(
+                response.raw, "document.children.item", use_float=True
+            )
+        else:
+            figma_data = load_spooled_json(response)
+            yield from figma_data.get("document", {}).get("children", [])
+
+
+def load_spooled_json(response: requests.Response) -> Dict[str, Any]:
+    """Parse a response body after spooling it to a temporary file"""
+    # The raw bytes live in the OS page cache rather than on the Python
+    # heap next to the parsed document; the file is deleted on close
+    with tempfile.TemporaryFile() as spool:
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            spool.write(chunk)
+        spool.flush()
+        size = spool.tell()
+        spool.seek(0)
+
+        # An empty body cannot be mapped; json.load reports it as invalid JSON
+        if orjson and size:
+            with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        return json.load(spool)
+
+
+def convert_to_yaml(pages: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert streamed Figma pages to YAML files"""
     normalizer = FigmaNormalizer()
-    normalized_nodes = normalizer.normalize(figma_data)
+    normalized_nodes = normalizer.normalize_pages(pages)
 
     if not normalized_nodes:
         raise Exception("No nodes found to convert")
@@ -151,38 +203,40 @@ def convert_to_yaml(figma_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     return screens
 
 
-def create_yaml_files(screens: List[Dict[str, Any]]) -> Dict[str, str]:
-    """Convert screens to YAML files and return as dict"""
+def create_yaml_files(screens: List[Dict[str, Any]]) -> Dict[str, bytes]:
+    """Convert screens to UTF-8 YAML files and return as dict"""
     yaml_files = {}
-    filename_counts = {}
+    filename_counts = Counter()
 
-    for screen in screens:
-        output = {
-            "screen": {"name": screen["name"], "children": screen.get("children", [])}
-        }
-        yaml_content = yaml.dump(
-            output, default_flow_style=False, sort_keys=False, allow_unicode=True
-        )
+    # Dumped straight to UTF-8 bytes, which is what the ZIP stores. The
+    # converter only uses worker processes for large files; they are spawned,
+    # as forking the threaded Streamlit server is unsafe.
+    yaml_contents = YAMLConverter().dump_screens(
+        screens, mp_context=multiprocessing.get_context("spawn")
+    )
 
-        base_filename = re.sub(r"[^\w\s-]", "", screen["name"].lower())
-        base_filename = re.sub(r"[\s_]+", "_", base_filename).strip("_")
+    for screen, yaml_content in zip(screens, yaml_contents):
+        base_filename = sanitize_name(screen["name"])
 
-        if base_filename in filename_counts:
-            filename_counts[base_filename] += 1
-            filename = f"{base_filename}_{filename_counts[base_filename]}.yaml"
-        else:
-            filename_counts[base_filename] = 1
+        filename_counts[base_filename] += 1
+        count = filename_counts[base_filename]
+        if count == 1:
             filename = f"{base_filename}.yaml"
+        else:
+            filename = f"{base_filename}_{count}.yaml"
 
         yaml_files[filename] = yaml_content
 
     return yaml_files
 
 
-def create_zip_file(yaml_files: Dict[str, str]) -> BytesIO:
+def create_zip_file(yaml_files: Dict[str, bytes]) -> BytesIO:
     """Create a zip file containing all YAML files"""
     zip_buffer = BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    # Level 1: YAML compresses well even at the fastest setting
+    with zipfile.ZipFile(
+        zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+    ) as zip_file:
         for filename, content in yaml_files.items():
             zip_file.writestr(f"generated/{filename}", content)
     zip_buffer.seek(0)
@@ -275,12 +329,12 @@ def main():
                 # Step 2: Download from Figma
                 status_text.text("📥 Downloading from Figma API...")
                 progress_bar.progress(40)
-                figma_data = download_figma_file(token, file_key)
+                pages = download_figma_file(token, file_key)
 
-                # Step 3: Convert to YAML
+                # Step 3: Convert to YAML (pages are parsed as they download)
                 status_text.text("🔄 Converting to YAML format...")
                 progress_bar.progress(60)
-                screens = convert_to_yaml(figma_data)
+                screens = convert_to_yaml(pages)
 
                 # Step 4: Generate YAML files
                 status_text.text("📝 Generating YAML files...")
@@ -321,7 +375,7 @@ def main():
                 st.markdown("### 👀 Preview")
                 preview_file = st.selectbox("Select a file to preview:", list(yaml_files.keys()))
                 if preview_file:
-                    st.code(yaml_files[preview_file], language="yaml")
+                    st.code(yaml_files[preview_file].decode("utf-8"), language="yaml")
 
             except ValueError as e:
                 st.markdown('<div class="error-box">', unsafe_allow_html=True)
@@ -6,18 +6,42 @@ Quick test of the updated converter
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library
+    orjson = None
+
 # Import the converter classes
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from convert_to_yaml_v2 import FigmaNormalizer, SemanticMapper, YAMLConverter
+import importlib.util
+
+spec = importlib.util.spec_from_file_location(
+    "converter", Path(__file__).parent / "2_convert_to_yaml.py"
+)
+converter = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(converter)
+FigmaNormalizer = converter.FigmaNormalizer
+SemanticMapper = converter.SemanticMapper
+YAMLConverter = converter.YAMLConverter
+
+# Layer names that must keep their asset classification
+for name in ("ArrowLeft", "searchIcon", "IconButton", "icClose", "icon24", "ic_home"):
+    assert converter._is_icon_name(name), name
+for name in ("heroImage", "userAvatar", "bg_header"):
+    assert converter._is_image_name(name), name
+for name in ("feedback", "Frame 12"):
+    assert not converter._is_icon_name(name), name
+
+print("✅ Layer name classification checks passed\n")
 
 # Load the test JSON
 json_file = "ucrbA01Va5RCZ2x6HgTjvB.json"
 
-with open(json_file, "r", encoding="utf-8") as f:
-    figma_data = json.load(f)
+with open(json_file, "rb") as f:
+    figma_data = orjson.loads(f.read()) if orjson else json.load(f)
 
 # Normalize
 normalizer = FigmaNormalizer()
@@ -46,16 +70,21 @@ def count_assets(element):
     icons = 0
     images = 0
 
-    if isinstance(element, dict):
-        if element.get("type") == "icon":
+    # Explicit stack, so deep screens don't hit the recursion limit
+    stack = [element]
+    while stack:
+        element = stack.pop()
+        # Exact type check: the screen tree only ever holds plain dicts
+        if type(element) is not dict:
+            continue
+
+        element_type = element.get("type")
+        if element_type == "icon":
             icons += 1
-        if element.get("type") == "image":
+        elif element_type == "image":
             images += 1
 
-        for child in element.get("children", []):
-            i, img = count_assets(child)
-            icons += i
-            images += img
+        stack.extend(element.get("children", []))
 
     return icons, images
 